@@ -21,19 +21,43 @@ export type GetOtpFn = () => Promise<string>;
 export async function runWorkflow(
   data: FormData,
   getOtp: GetOtpFn,
-  onProgress?: ProgressCallback
+  onProgress?: ProgressCallback,
+  signal?: AbortSignal
 ) {
   let stagehand: Stagehand | null = null;
+  let closing: Promise<void> | null = null;
 
   const log = (msg: string) => {
     console.log(msg);
     onProgress?.(msg);
   };
 
+  // Close at most once; a failed close (e.g. mid-init) may be retried
+  const closeStagehand = () => {
+    if (stagehand && !closing) {
+      closing = stagehand.close().catch((err) => {
+        closing = null;
+        throw err;
+      });
+    }
+    return closing;
+  };
+
+  // Closing the browser makes any pending act()/goto() reject, so an aborted
+  // workflow unwinds instead of hanging on a stuck page
+  const onAbort = () => {
+    log("Workflow aborted, closing browser");
+    closeStagehand()?.catch(() => {});
+  };
+  signal?.addEventListener("abort", onAbort, { once: true });
+
   try {
+    signal?.throwIfAborted();
+
     log("Initializing Stagehand...");
     stagehand = new Stagehand(StagehandConfig);
     await stagehand.init();
+    signal?.throwIfAborted();
 
     const page: any =
       (stagehand as any).page ?? stagehand.context.pages()[0];
@@ -70,8 +94,7 @@ export async function runWorkflow(
     log("Workflow failed");
     throw err;
   } finally {
-    if (stagehand) {
-      await stagehand.close();
-    }
+    signal?.removeEventListener("abort", onAbort);
+    await closeStagehand();
   }
 }
@@ -8,13 +8,47 @@ const app = express();
 const server = http.createServer(app);
 const wss = new WebSocketServer({ server });
 
+// Unset, non-numeric, zero or negative values fall back to the default
+const positiveIntEnv = (name: string, fallback: number) => {
+  const value = Number.parseInt(process.env[name] ?? "", 10);
+  return value > 0 ? value : fallback;
+};
+
+// Each workflow launches its own Chromium through Stagehand, so cap how many
+// run at once; extra submissions wait in FIFO order for a free slot.
+const MAX_CONCURRENT_WORKFLOWS = positiveIntEnv("MAX_CONCURRENT_WORKFLOWS", 4);
+// Upper bound on one workflow (including the OTP wait) so a hung run cannot
+// hold its slot forever
+const WORKFLOW_TIMEOUT_MS = positiveIntEnv("WORKFLOW_TIMEOUT_MS", 10 * 60_000);
+let activeWorkflows = 0;
+const workflowQueue: (() => void)[] = [];
+
+const acquireWorkflowSlot = () =>
+  new Promise<void>((resolve) => {
+    if (activeWorkflows < MAX_CONCURRENT_WORKFLOWS) {
+      activeWorkflows++;
+      resolve();
+    } else {
+      workflowQueue.push(resolve);
+    }
+  });
+
+const releaseWorkflowSlot = () => {
+  const next = workflowQueue.shift();
+  // Hand the slot straight to the next waiter, otherwise free it
+  if (next) next();
+  else activeWorkflows--;
+};
+
 app.get("/health", (_, res) => res.json({ ok: true }));
 
 wss.on("connection", (ws: WebSocket) => {
   console.log("🔌 WebSocket connected");
 
   let otpResolver: ((otp: string) => void) | null = null;
+  let otpRejecter: ((err: Error) => void) | null = null;
   let workflowRunning = false;
+  let closed = false;
 
   const send = (type: string, payload: any = {}) => {
     ws.readyState === WebSocket.OPEN &&
@@ -28,21 +62,63 @@ wss.on("connection", (ws: WebSocket) => {
     if (msg.type === "FORM_SUBMIT" && !workflowRunning) {
       workflowRunning = true;
 
+      if (activeWorkflows >= MAX_CONCURRENT_WORKFLOWS) {
+        send("LOG", "Waiting for a free browser slot...");
+      }
+      await acquireWorkflowSlot();
+
+      let workflow: Promise<unknown> | undefined;
+
       try {
+        // Client may have gone away while queued
+        if (ws.readyState !== WebSocket.OPEN) return;
+
         send("LOG", "Starting workflow...");
 
         const getOtp = () =>
-          new Promise<string>((resolve) => {
+          new Promise<string>((resolve, reject) => {
+            // Client left before the OTP step; REQUEST_OTP would be dropped
+            // and nobody could ever answer it
+            if (closed || ws.readyState !== WebSocket.OPEN) {
+              reject(new Error("WebSocket closed before OTP was requested"));
+              return;
+            }
             otpResolver = resolve;
+            otpRejecter = reject;
             send("REQUEST_OTP");
           });
 
-        await runWorkflow(
+        const controller = new AbortController();
+        workflow = runWorkflow(
           msg.payload,
           getOtp,
-          (m) => send("LOG", m)
+          (m) => send("LOG", m),
+          controller.signal
         );
 
+        let timer: NodeJS.Timeout | undefined;
+        const timeout = new Promise<never>((_, reject) => {
+          timer = setTimeout(() => {
+            const err = new Error(
+              `Workflow timed out after ${WORKFLOW_TIMEOUT_MS / 1000}s`
+            );
+            // Closes the browser, which also fails any pending act()/goto()
+            controller.abort(err);
+            // Unblock a workflow parked on the OTP so it can finish unwinding
+            otpRejecter?.(err);
+            otpResolver = null;
+            otpRejecter = null;
+            reject(err);
+          }, WORKFLOW_TIMEOUT_MS);
+        });
+
+        try {
+          // The client hears about a timeout right away...
+          await Promise.race([workflow, timeout]);
+        } finally {
+          clearTimeout(timer);
+        }
+
         send("SUBMISSION_RESULT", { success: true });
       } catch (e: any) {
         send("SUBMISSION_RESULT", {
@@ -50,8 +126,13 @@ wss.on("connection", (ws: WebSocket) => {
           message: e.message,
         });
       } finally {
-        workflowRunning = false;
         setTimeout(() => ws.close(), 1000);
+
+        // ...but the slot is only freed once runWorkflow has settled and its
+        // browser is closed, so the cap really bounds open browsers
+        await workflow?.catch(() => {});
+        releaseWorkflowSlot();
+        workflowRunning = false;
       }
     }
 
@@ -59,11 +140,21 @@ wss.on("connection", (ws: WebSocket) => {
     if (msg.type === "OTP_SUBMIT" && otpResolver) {
       otpResolver(msg.payload.otp);
       otpResolver = null;
+      otpRejecter = null;
       send("LOG", "OTP submitted by user");
     }
   });
 
-  ws.on("close", () => console.log("❌ WebSocket disconnected"));
+  ws.on("close", () => {
+    console.log("❌ WebSocket disconnected");
+    closed = true;
+
+    // A workflow parked on getOtp() would otherwise wait forever, keeping its
+    // browser open and its workflow slot taken
+    otpRejecter?.(new Error("WebSocket closed before OTP was submitted"));
+    otpResolver = null;
+    otpRejecter = null;
+  });
 });
 
 server.listen(3000, () =>